@@ -4,12 +4,19 @@ Single-file Streamlit application for EOR termination liability modeling
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from enum import IntEnum
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple, Union
 import json
+import hashlib
+from pathlib import Path
 
 # ============================================================================
 # PAGE CONFIG
@@ -148,6 +155,401 @@ FX_VOLATILITY = {
     "MXN": 0.14, "GBP": 0.05, "SGD": 0.03, "AUD": 0.07
 }
 
+# Reciprocals of the calendar divisors used across the calculators, so the
+# per-employee math multiplies instead of divides
+INV_WORK_DAYS_PER_MONTH = 1 / 22
+INV_WEEKS_PER_MONTH = 1 / 4.33
+INV_DAYS_PER_MONTH = 1 / 30
+INV_GRATUITY_DAYS_PER_MONTH = 1 / 26
+INV_DAYS_PER_YEAR = 1 / 365
+INV_DAYS_PER_TENURE_YEAR = 1 / 365.25
+
+# Annual paid leave entitlement (days) used for vacation accrual
+VACATION_ACCRUAL_DAYS = {
+    "BR": 30, "FR": 25, "DE": 20, "IN": 21, "PH": 5,
+    "MX": 12, "GB": 28, "NL": 20, "SG": 14, "AU": 20
+}
+
+# ============================================================================
+# COMPILED RULES
+# ============================================================================
+# COUNTRY_RULES is flattened once at import so the calculators dispatch on an
+# integer kind with pre-extracted parameters instead of walking the dicts.
+
+class NoticeKind(IntEnum):
+    NONE = 0
+    BASE_PLUS_PER_YEAR = 1  # Brazil: base days + days per year, capped
+    MONTH_TIERS = 2         # France: tiers keyed by tenure in months
+    YEAR_TIERS = 3          # Germany/UK/Netherlands/Australia: tiers keyed by tenure in years
+    BY_SENIORITY = 4        # India: typical vs senior days
+    FIXED_DAYS = 5          # Philippines/Mexico: flat number of days
+
+
+class SeveranceKind(IntEnum):
+    NONE = 0
+    FGTS = 1
+    TIERED = 2
+    MONTHS_PER_YEAR = 3
+    WEEKS_PER_YEAR = 4
+    GRATUITY = 5
+    ONE_MONTH_PER_YEAR = 6
+    CONSTITUTIONAL = 7
+    STATUTORY_REDUNDANCY = 8
+    TRANSITION_PAYMENT = 9
+    NSE_SCALE = 10
+
+
+LEGAL_RISK_SCORES = {"high": 0.9, "medium": 0.5, "low": 0.2}
+
+
+@dataclass(frozen=True)
+class CompiledCountryRule:
+    """Flat, pre-parsed view of one COUNTRY_RULES entry"""
+    name: str
+    legal_risk: str
+    legal_score: float
+    notice_kind: NoticeKind
+    notice_base_days: int = 0
+    notice_days_per_year: int = 0
+    notice_max_days: int = 0
+    notice_senior_days: int = 0
+    # Tier thresholds sorted ascending (months or years depending on notice_kind) with
+    # parallel arrays: fixed days, or weeks-per-year capped at max weeks where tier_per_year
+    tier_min: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    tier_days: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+    tier_per_year: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+    tier_weeks_per_year: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+    tier_max_weeks: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+    severance_kind: SeveranceKind = SeveranceKind.NONE
+    min_tenure_months: float = 0
+    min_tenure_years: float = 0
+    fgts_penalty: float = 0.0
+    months_per_year: float = 0.0
+    weeks_per_year: float = 0.0
+    constitutional_months: float = 0.0
+    seniority_days_per_year: float = 0.0
+    weekly_cap: float = 0.0
+    max_years: float = 0.0
+    max_amount: float = 0.0
+    scale: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    # Accrual parameters; a rate of zero switches the component off
+    thirteenth_month: float = 0.0
+    aguinaldo_days: float = 0.0
+    holiday_allowance_rate: float = 0.0
+    statutory_bonus_rate: float = 0.0
+    bonus_salary_cap: float = np.inf
+    vacation_bonus_rate: float = 0.0
+    annual_leave_days: float = 20.0
+    # Specialized calculators built from the fields above (see _make_notice_fn/_make_severance_fn)
+    notice_fn: Optional[Callable] = field(default=None, repr=False)
+    severance_fn: Optional[Callable] = field(default=None, repr=False)
+
+
+def _compile_notice(notice_config: dict) -> dict:
+    """Classify a notice_period config and extract its parameters"""
+    if "base_days" in notice_config:
+        return dict(
+            notice_kind=NoticeKind.BASE_PLUS_PER_YEAR,
+            notice_base_days=notice_config.get("base_days", 30),
+            notice_days_per_year=notice_config.get("additional_days_per_year", 0),
+            notice_max_days=notice_config.get("max_days", 90)
+        )
+    if "tiers" in notice_config:
+        tiers = notice_config["tiers"]
+        if any("min_months" in t for t in tiers):
+            kind, key = NoticeKind.MONTH_TIERS, "min_months"
+        else:
+            kind, key = NoticeKind.YEAR_TIERS, "min_years"
+        # Tiers without a threshold or a duration never apply
+        rows = []
+        for tier in tiers:
+            if key not in tier:
+                continue
+            if "days" in tier and kind == NoticeKind.MONTH_TIERS:
+                rows.append((tier[key], tier["days"], False, 0, 0))
+            elif "weeks" in tier:
+                rows.append((tier[key], tier["weeks"] * 7, False, 0, 0))
+            elif "weeks_per_year" in tier:
+                rows.append((tier[key], 0, True, tier["weeks_per_year"], tier.get("max_weeks", 12)))
+            elif "months" in tier:
+                rows.append((tier[key], tier["months"] * 30, False, 0, 0))
+            elif kind == NoticeKind.MONTH_TIERS:
+                rows.append((tier[key], 0, False, 0, 0))
+        if not rows:
+            return dict(notice_kind=NoticeKind.NONE)
+        # Stable sort keeps the later of two equal thresholds last, so it wins
+        # (matching the old in-order scan where each reached tier overwrote the last)
+        rows.sort(key=lambda r: r[0])
+        min_, days, per_year, weeks_per_year, max_weeks = zip(*rows)
+        return dict(
+            notice_kind=kind,
+            tier_min=np.array(min_, dtype=float),
+            tier_days=np.array(days, dtype=np.int32),
+            tier_per_year=np.array(per_year, dtype=bool),
+            tier_weeks_per_year=np.array(weeks_per_year, dtype=np.int32),
+            tier_max_weeks=np.array(max_weeks, dtype=np.int32)
+        )
+    if "typical_days" in notice_config:
+        return dict(
+            notice_kind=NoticeKind.BY_SENIORITY,
+            notice_base_days=notice_config["typical_days"],
+            notice_senior_days=notice_config.get("senior_days", notice_config["typical_days"])
+        )
+    if "standard_days" in notice_config:
+        return dict(notice_kind=NoticeKind.FIXED_DAYS, notice_base_days=notice_config["standard_days"])
+    if "days" in notice_config:
+        return dict(notice_kind=NoticeKind.FIXED_DAYS, notice_base_days=notice_config["days"])
+    return dict(notice_kind=NoticeKind.NONE)
+
+
+def _compile_severance(sev_config: dict) -> dict:
+    """Classify a severance config and extract its parameters"""
+    formula = sev_config.get("formula", sev_config.get("formula_type", ""))
+    params = dict(
+        min_tenure_months=sev_config.get("min_tenure_months", 0),
+        min_tenure_years=sev_config.get("min_tenure_years", 0)
+    )
+    
+    if formula == "fgts_based":
+        kind = SeveranceKind.FGTS
+        params["fgts_penalty"] = sev_config.get("fgts_penalty_percent", 40) / 100
+    elif formula == "tiered":
+        kind = SeveranceKind.TIERED
+    elif formula == "market_practice":
+        if sev_config.get("weeks_per_year", 0):
+            kind = SeveranceKind.WEEKS_PER_YEAR
+            params["weeks_per_year"] = sev_config["weeks_per_year"]
+        else:
+            kind = SeveranceKind.MONTHS_PER_YEAR
+            params["months_per_year"] = sev_config.get("months_per_year", 0.5)
+    elif formula == "gratuity":
+        kind = SeveranceKind.GRATUITY
+    elif formula == "one_month_per_year":
+        kind = SeveranceKind.ONE_MONTH_PER_YEAR
+    elif "constitutional_months" in sev_config:
+        kind = SeveranceKind.CONSTITUTIONAL
+        params["constitutional_months"] = sev_config["constitutional_months"]
+        params["seniority_days_per_year"] = sev_config.get("seniority_days_per_year", 12)
+    elif formula == "statutory_redundancy":
+        kind = SeveranceKind.STATUTORY_REDUNDANCY
+        params["weekly_cap"] = sev_config.get("weekly_cap", 700)
+        params["max_years"] = sev_config.get("max_years", 20)
+    elif formula == "transition_payment":
+        kind = SeveranceKind.TRANSITION_PAYMENT
+        params["months_per_year"] = sev_config.get("months_per_year", 0.33)
+        params["max_amount"] = sev_config.get("max_eur", 94000)
+    elif formula == "nse_scale" and sev_config.get("scale"):
+        kind = SeveranceKind.NSE_SCALE
+        params["scale"] = np.array(sev_config["scale"], dtype=float)
+    else:
+        kind = SeveranceKind.NONE
+    
+    return dict(severance_kind=kind, **params)
+
+
+def _compile_bonuses(bonuses: dict) -> dict:
+    """Extract statutory bonus accrual parameters"""
+    return dict(
+        thirteenth_month=1.0 if bonuses.get("13th_month") else 0.0,
+        aguinaldo_days=bonuses.get("aguinaldo_days", 0),
+        holiday_allowance_rate=bonuses.get("holiday_allowance_percent", 0) / 100,
+        statutory_bonus_rate=bonuses.get("statutory_bonus_percent", 0) / 100,
+        bonus_salary_cap=bonuses.get("salary_cap", np.inf),
+        vacation_bonus_rate=bonuses.get("vacation_bonus", 0) / 100
+    )
+
+
+def _make_notice_fn(rule: CompiledCountryRule) -> Callable:
+    """Specialize a rule's notice period into fn(tenure_months, tenure_years, job_level) for scalars or arrays"""
+    match rule.notice_kind:
+        case NoticeKind.BASE_PLUS_PER_YEAR:
+            base, per_year, max_days = rule.notice_base_days, rule.notice_days_per_year, rule.notice_max_days
+            
+            def notice_days(tenure_months, tenure_years, job_level):
+                return np.minimum(base + (np.asarray(tenure_years, dtype=float) * per_year).astype(int), max_days)
+        
+        case NoticeKind.MONTH_TIERS | NoticeKind.YEAR_TIERS:
+            by_months = rule.notice_kind == NoticeKind.MONTH_TIERS
+            tier_min, tier_days = rule.tier_min, rule.tier_days
+            tier_per_year, weeks_per_year, max_weeks = rule.tier_per_year, rule.tier_weeks_per_year, rule.tier_max_weeks
+            hybrid = bool(tier_per_year.any())
+            
+            def notice_days(tenure_months, tenure_years, job_level):
+                tenure_years = np.asarray(tenure_years, dtype=float)
+                # Highest tier whose threshold has been reached; -1 when below the first tier
+                idx = np.searchsorted(tier_min, tenure_months if by_months else tenure_years, side="right") - 1
+                tier = np.maximum(idx, 0)
+                days = tier_days[tier]
+                if hybrid:
+                    # Hybrid schedules (UK): some tiers scale with completed years of service
+                    per_year_weeks = np.minimum(tenure_years.astype(int) * weeks_per_year[tier], max_weeks[tier])
+                    days = np.where(tier_per_year[tier], per_year_weeks * 7, days)
+                return np.where(idx >= 0, days, 0)
+        
+        case NoticeKind.BY_SENIORITY:
+            typical_days, senior_days = rule.notice_base_days, rule.notice_senior_days
+            
+            def notice_days(tenure_months, tenure_years, job_level):
+                senior = np.isin(job_level, ["director", "head", "principal", "lead"])
+                return np.where(senior, senior_days, typical_days)
+        
+        case NoticeKind.FIXED_DAYS:
+            fixed_days = rule.notice_base_days
+            
+            def notice_days(tenure_months, tenure_years, job_level):
+                return np.full(np.shape(tenure_years), fixed_days)
+        
+        case _:
+            def notice_days(tenure_months, tenure_years, job_level):
+                return np.zeros(np.shape(tenure_years), dtype=int)
+    
+    return notice_days
+
+
+def _make_severance_fn(rule: CompiledCountryRule) -> Callable:
+    """Specialize a rule's severance formula into fn(monthly_salary, tenure_months, tenure_years) for scalars or arrays"""
+    match rule.severance_kind:
+        case SeveranceKind.FGTS:
+            # Brazil: 40% penalty on FGTS balance
+            fgts_penalty = rule.fgts_penalty
+            
+            def formula(monthly_salary, tenure_years):
+                fgts_balance = monthly_salary * 0.08 * 12 * tenure_years
+                return fgts_balance * fgts_penalty
+        
+        case SeveranceKind.TIERED:
+            # France: 1/4 month per year (first 10), 1/3 after
+            def formula(monthly_salary, tenure_years):
+                return np.where(
+                    tenure_years <= 10,
+                    0.25 * monthly_salary * tenure_years,
+                    (0.25 * monthly_salary * 10) + (0.33 * monthly_salary * (tenure_years - 10))
+                )
+        
+        case SeveranceKind.MONTHS_PER_YEAR:
+            # Germany: X months per year
+            months_per_year = rule.months_per_year
+            
+            def formula(monthly_salary, tenure_years):
+                return months_per_year * monthly_salary * tenure_years
+        
+        case SeveranceKind.WEEKS_PER_YEAR:
+            # Singapore: X weeks per year
+            weeks_per_year = rule.weeks_per_year
+            
+            def formula(monthly_salary, tenure_years):
+                return (monthly_salary * INV_WEEKS_PER_MONTH) * weeks_per_year * tenure_years
+        
+        case SeveranceKind.GRATUITY:
+            # India: 15 days per year after 5 years
+            def formula(monthly_salary, tenure_years):
+                daily_rate = monthly_salary * INV_GRATUITY_DAYS_PER_MONTH
+                return np.where(tenure_years >= 5, 15 * daily_rate * tenure_years, 0.0)
+        
+        case SeveranceKind.ONE_MONTH_PER_YEAR:
+            # Philippines
+            def formula(monthly_salary, tenure_years):
+                return monthly_salary * np.maximum(1, tenure_years)
+        
+        case SeveranceKind.CONSTITUTIONAL:
+            # Mexico: 3 months + seniority premium
+            constitutional_months, seniority_days = rule.constitutional_months, rule.seniority_days_per_year
+            
+            def formula(monthly_salary, tenure_years):
+                base = constitutional_months * monthly_salary
+                return base + (monthly_salary * INV_DAYS_PER_MONTH) * seniority_days * tenure_years
+        
+        case SeveranceKind.STATUTORY_REDUNDANCY:
+            # UK
+            weekly_cap, max_years = rule.weekly_cap, rule.max_years
+            
+            def formula(monthly_salary, tenure_years):
+                weekly_pay = np.minimum(monthly_salary * INV_WEEKS_PER_MONTH, weekly_cap)
+                return weekly_pay * np.minimum(tenure_years, max_years)
+        
+        case SeveranceKind.TRANSITION_PAYMENT:
+            # Netherlands
+            months_per_year, max_amount = rule.months_per_year, rule.max_amount
+            
+            def formula(monthly_salary, tenure_years):
+                return np.minimum(months_per_year * monthly_salary * tenure_years, max_amount)
+        
+        case SeveranceKind.NSE_SCALE:
+            # Australia: weeks of pay from the NSE scale, one gather per country group
+            scale, last_year = rule.scale, len(rule.scale) - 1
+            
+            def formula(monthly_salary, tenure_years):
+                year_index = np.clip(tenure_years.astype(np.int32) - 1, 0, last_year)
+                return np.where(tenure_years >= 1, (monthly_salary * INV_WEEKS_PER_MONTH) * scale[year_index], 0.0)
+        
+        case _:
+            def formula(monthly_salary, tenure_years):
+                return np.zeros(np.shape(tenure_years))
+    
+    # The eligibility mask applies to every rule: even without a minimum tenure it zeroes
+    # severance for negative tenure (start dates in the future)
+    min_months, min_years = rule.min_tenure_months, rule.min_tenure_years
+    
+    def severance(monthly_salary, tenure_months, tenure_years):
+        tenure_years = np.asarray(tenure_years, dtype=float)
+        eligible = (tenure_months >= min_months) & (tenure_years >= min_years)
+        return np.where(eligible, formula(np.asarray(monthly_salary, dtype=float), tenure_years), 0.0)
+    
+    return severance
+
+
+def _compile(code: str, country: dict) -> CompiledCountryRule:
+    """Compile one COUNTRY_RULES entry"""
+    legal_risk = country.get("legal_risk", "medium")
+    rule = CompiledCountryRule(
+        name=country.get("name", ""),
+        legal_risk=legal_risk,
+        legal_score=LEGAL_RISK_SCORES.get(legal_risk, 0.5),
+        annual_leave_days=VACATION_ACCRUAL_DAYS.get(code, 20),
+        **_compile_notice(country.get("notice_period", {})),
+        **_compile_severance(country.get("severance", {})),
+        **_compile_bonuses(country.get("statutory_bonuses", {}))
+    )
+    return replace(rule, notice_fn=_make_notice_fn(rule), severance_fn=_make_severance_fn(rule))
+
+
+COMPILED_RULES: Dict[str, CompiledCountryRule] = {code: _compile(code, rules) for code, rules in COUNTRY_RULES.items()}
+DEFAULT_RULE = _compile("", {})
+
+# Integer country ids and per-country parameter columns for the uniform (branch-free)
+# parts of the calculation; the extra last row holds DEFAULT_RULE for unknown countries
+Country = IntEnum("Country", list(COMPILED_RULES), start=0)
+COUNTRY_INDEX = {country.name: country.value for country in Country}
+DEFAULT_COUNTRY_INDEX = len(Country)
+_TABLE_RULES = [*COMPILED_RULES.values(), DEFAULT_RULE]
+RULE_TABLE = {
+    param: np.array([getattr(rule, param) for rule in _TABLE_RULES], dtype=float)
+    for param in (
+        "legal_score", "thirteenth_month", "aguinaldo_days", "holiday_allowance_rate",
+        "statutory_bonus_rate", "bonus_salary_cap", "vacation_bonus_rate", "annual_leave_days"
+    )
+}
+LEGAL_RISK_LABELS = np.array([rule.legal_risk.title() for rule in _TABLE_RULES], dtype=object)
+
+# Integer currency ids (rated currencies first, then FX_RATES-only ones such as USD)
+# with rate, volatility and rating-code lookups; the extra last row is the default
+# for unknown currencies (unconverted, 10% volatility)
+Currency = IntEnum("Currency", list(dict.fromkeys([*FX_VOLATILITY, *FX_RATES])), start=0)
+CURRENCY_INDEX = {currency.name: currency.value for currency in Currency}
+DEFAULT_CURRENCY_INDEX = len(Currency)
+# A zero rate leaves the amount unconverted, as in convert_to_usd
+FX_RATES_ARR = np.array([FX_RATES.get(currency.name, 1.0) or 1.0 for currency in Currency] + [1.0])
+VOLATILITY_TABLE = np.array([FX_VOLATILITY.get(currency.name, 0.10) for currency in Currency] + [0.10])
+VOLATILITY_RATINGS = np.array(["Low", "Medium", "High"], dtype=object)
+
+
+def rate_volatility(volatility: np.ndarray) -> np.ndarray:
+    """Rating codes (indexes into VOLATILITY_RATINGS) for an array of 30-day volatilities"""
+    return np.select([volatility >= 0.12, volatility >= 0.06], [2, 1], 0)
+
+
+VOLATILITY_RATING_TABLE = rate_volatility(VOLATILITY_TABLE)
+
 # ============================================================================
 # SAMPLE DATA
 # ============================================================================
@@ -179,223 +581,156 @@ SAMPLE_EMPLOYEES = [
     {"employee_id": "EMP025", "name": "Isabella Morales", "country_code": "MX", "start_date": "2020-03-01", "monthly_salary_local": 72000, "currency": "MXN", "department": "Engineering", "job_level": "senior", "age": 34},
 ]
 
+# Optional columnar employee file; when present it replaces the embedded sample
+EMPLOYEES_PARQUET = Path(__file__).with_name("employees.parquet")
+
+
+@st.cache_resource
+def load_employees() -> pd.DataFrame:
+    """Load the employee portfolio once per process as a typed, columnar DataFrame"""
+    if EMPLOYEES_PARQUET.exists():
+        df = pd.read_parquet(EMPLOYEES_PARQUET)
+    else:
+        df = pd.DataFrame(SAMPLE_EMPLOYEES)
+    # Only the columns calculate_portfolio consumes are cast; optional ones may be absent
+    return df.astype({
+        "start_date": "datetime64[ns]",
+        "monthly_salary_local": "float64"
+    })
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Content digest of a DataFrame, used as a cheap cache key"""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+
+@st.cache_resource
+def employees_digest() -> str:
+    """Digest of the loaded portfolio, computed once per process"""
+    return frame_digest(load_employees())
+
+
 # ============================================================================
 # CALCULATION ENGINE
 # ============================================================================
 
-def calculate_tenure(start_date_str: str) -> Tuple[int, int, float]:
+@dataclass(frozen=True, slots=True)
+class DayCtx:
+    """Calendar values shared by every employee in one calculation"""
+    today: date
+    year_start: date
+    year_progress: float
+    days_in_year: int  # days elapsed since January 1st
+    today_ordinal: int  # proleptic Gregorian ordinal of today, for integer tenure math
+    
+    @classmethod
+    def for_date(cls, today: Optional[date] = None) -> "DayCtx":
+        today = today or date.today()
+        today_ordinal = today.toordinal()
+        year_start = date(today.year, 1, 1)
+        days_in_year = today_ordinal - year_start.toordinal()
+        return cls(today, year_start, days_in_year * INV_DAYS_PER_YEAR, days_in_year, today_ordinal)
+
+
+@lru_cache(maxsize=4096)
+def _parse_start_ordinal(start_date_str: str) -> int:
+    """Parse an ISO start date once; employees keep the same start date across reruns"""
+    return datetime.strptime(start_date_str, "%Y-%m-%d").date().toordinal()
+
+
+def calculate_tenure(start_date_str: str, today: Optional[date] = None,
+                     today_ordinal: Optional[int] = None) -> Tuple[int, int, float]:
     """Calculate tenure in days, months, and years"""
-    start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
-    today = date.today()
-    days = (today - start_date).days
+    if today_ordinal is None:
+        today_ordinal = (today or date.today()).toordinal()
+    days = today_ordinal - _parse_start_ordinal(start_date_str)
     months = days // 30
-    years = days / 365.25
+    years = days * INV_DAYS_PER_TENURE_YEAR
     return days, months, years
 
 
 def convert_to_usd(amount: float, currency: str) -> float:
     """Convert local currency to USD"""
-    rate = FX_RATES.get(currency, 1.0)
-    return amount / rate if rate != 0 else amount
+    return amount / FX_RATES_ARR[CURRENCY_INDEX.get(currency, DEFAULT_CURRENCY_INDEX)]
 
 
 def get_volatility_rating(currency: str) -> str:
     """Get volatility rating for currency"""
-    vol = FX_VOLATILITY.get(currency, 0.10)
-    if vol >= 0.12:
-        return "High"
-    elif vol >= 0.06:
-        return "Medium"
-    return "Low"
+    return VOLATILITY_RATINGS[VOLATILITY_RATING_TABLE[CURRENCY_INDEX.get(currency, DEFAULT_CURRENCY_INDEX)]]
+
+
+def _bonus_accrual(rule, monthly_salary, year_progress: float):
+    """Prorated statutory bonuses"""
+    # Branch-free: rule may be a CompiledCountryRule or a namespace of gathered RULE_TABLE columns
+    monthly_salary = np.asarray(monthly_salary, dtype=float)
+    capped = np.minimum(monthly_salary, rule.bonus_salary_cap)
+    annual = (
+        monthly_salary * rule.thirteenth_month                              # 13th month
+        + (monthly_salary * INV_DAYS_PER_MONTH) * rule.aguinaldo_days       # Mexico aguinaldo
+        + monthly_salary * 12 * rule.holiday_allowance_rate                 # Netherlands holiday allowance
+        + capped * 12 * rule.statutory_bonus_rate                           # India statutory bonus
+        + monthly_salary * rule.vacation_bonus_rate                         # Brazil vacation bonus
+    )
+    return annual * year_progress
 
 
-def calculate_notice_period(employee: dict, country: dict) -> Tuple[int, float]:
+def calculate_notice_period(employee: dict, rule: CompiledCountryRule,
+                            tenure_months: int, tenure_years: float) -> Tuple[int, float]:
     """Calculate notice period in days and cost"""
-    _, tenure_months, tenure_years = calculate_tenure(employee["start_date"])
-    daily_rate = employee["monthly_salary_local"] / 22
-    notice_config = country.get("notice_period", {})
-    notice_days = 0
-    
-    if "base_days" in notice_config:
-        # Brazil style
-        base = notice_config.get("base_days", 30)
-        per_year = notice_config.get("additional_days_per_year", 0)
-        max_days = notice_config.get("max_days", 90)
-        notice_days = min(base + int(tenure_years * per_year), max_days)
-    elif "tiers" in notice_config:
-        for tier in notice_config["tiers"]:
-            if "min_months" in tier:
-                if tenure_months >= tier.get("min_months", 0):
-                    notice_days = tier.get("days", 0)
-            elif "min_years" in tier:
-                if tenure_years >= tier.get("min_years", 0):
-                    if "weeks" in tier:
-                        notice_days = tier["weeks"] * 7
-                    elif "weeks_per_year" in tier:
-                        max_weeks = tier.get("max_weeks", 12)
-                        notice_days = min(int(tenure_years) * tier["weeks_per_year"], max_weeks) * 7
-                    elif "months" in tier:
-                        notice_days = tier["months"] * 30
-    elif "typical_days" in notice_config:
-        notice_days = notice_config["typical_days"]
-        if employee.get("job_level") in ["director", "head", "principal", "lead"]:
-            notice_days = notice_config.get("senior_days", notice_days)
-    elif "standard_days" in notice_config:
-        notice_days = notice_config["standard_days"]
-    elif "days" in notice_config:
-        notice_days = notice_config["days"]
-    
+    daily_rate = employee["monthly_salary_local"] * INV_WORK_DAYS_PER_MONTH
+    notice_days = int(rule.notice_fn(tenure_months, tenure_years, employee.get("job_level")))
     return notice_days, notice_days * daily_rate
 
 
-def calculate_severance(employee: dict, country: dict) -> float:
+def calculate_severance(employee: dict, rule: CompiledCountryRule,
+                        tenure_months: int, tenure_years: float) -> float:
     """Calculate severance pay"""
-    _, tenure_months, tenure_years = calculate_tenure(employee["start_date"])
-    monthly_salary = employee["monthly_salary_local"]
-    sev_config = country.get("severance", {})
-    formula = sev_config.get("formula", sev_config.get("formula_type", ""))
-    
-    # Check minimum tenure
-    min_months = sev_config.get("min_tenure_months", 0)
-    min_years = sev_config.get("min_tenure_years", 0)
-    if tenure_months < min_months or tenure_years < min_years:
-        return 0.0
-    
-    if formula == "fgts_based":
-        # Brazil: 40% penalty on FGTS balance
-        fgts_balance = monthly_salary * 0.08 * 12 * tenure_years
-        return fgts_balance * (sev_config.get("fgts_penalty_percent", 40) / 100)
-    
-    elif formula == "tiered":
-        # France: 1/4 month per year (first 10), 1/3 after
-        if tenure_years <= 10:
-            return 0.25 * monthly_salary * tenure_years
-        return (0.25 * monthly_salary * 10) + (0.33 * monthly_salary * (tenure_years - 10))
-    
-    elif formula == "market_practice":
-        # Germany/Singapore: X months per year
-        months_per_year = sev_config.get("months_per_year", 0.5)
-        weeks_per_year = sev_config.get("weeks_per_year", 0)
-        if weeks_per_year:
-            return (monthly_salary / 4.33) * weeks_per_year * tenure_years
-        return months_per_year * monthly_salary * tenure_years
-    
-    elif formula == "gratuity":
-        # India: 15 days per year after 5 years
-        if tenure_years >= 5:
-            daily_rate = monthly_salary / 26
-            return 15 * daily_rate * tenure_years
-        return 0
-    
-    elif formula == "one_month_per_year":
-        # Philippines
-        return monthly_salary * max(1, tenure_years)
-    
-    elif "constitutional_months" in sev_config:
-        # Mexico: 3 months + seniority premium
-        base = sev_config["constitutional_months"] * monthly_salary
-        seniority = (monthly_salary / 30) * sev_config.get("seniority_days_per_year", 12) * tenure_years
-        return base + seniority
-    
-    elif formula == "statutory_redundancy":
-        # UK
-        weekly_pay = min(monthly_salary / 4.33, sev_config.get("weekly_cap", 700))
-        years_counted = min(tenure_years, sev_config.get("max_years", 20))
-        return weekly_pay * years_counted
-    
-    elif formula == "transition_payment":
-        # Netherlands
-        severance = (sev_config.get("months_per_year", 0.33)) * monthly_salary * tenure_years
-        return min(severance, sev_config.get("max_eur", 94000))
-    
-    elif formula == "nse_scale":
-        # Australia
-        scale = sev_config.get("scale", [])
-        if tenure_years >= 1 and scale:
-            year_index = min(int(tenure_years) - 1, len(scale) - 1)
-            weeks = scale[year_index]
-            return (monthly_salary / 4.33) * weeks
-    
-    return 0
+    return float(rule.severance_fn(employee["monthly_salary_local"], tenure_months, tenure_years))
 
 
-def calculate_statutory_bonuses(employee: dict, country: dict) -> float:
+def calculate_statutory_bonuses(employee: dict, rule: CompiledCountryRule, ctx: DayCtx) -> float:
     """Calculate prorated statutory bonus accruals"""
-    monthly_salary = employee["monthly_salary_local"]
-    bonuses = country.get("statutory_bonuses", {})
-    
-    today = date.today()
-    year_start = date(today.year, 1, 1)
-    year_progress = (today - year_start).days / 365
-    
-    total = 0.0
-    
-    if bonuses.get("13th_month"):
-        total += monthly_salary * year_progress
-    
-    if "aguinaldo_days" in bonuses:
-        daily_rate = monthly_salary / 30
-        total += daily_rate * bonuses["aguinaldo_days"] * year_progress
-    
-    if "holiday_allowance_percent" in bonuses:
-        annual = monthly_salary * 12 * (bonuses["holiday_allowance_percent"] / 100)
-        total += annual * year_progress
-    
-    if "statutory_bonus_percent" in bonuses:
-        cap = bonuses.get("salary_cap", monthly_salary)
-        capped = min(monthly_salary, cap)
-        total += capped * 12 * (bonuses["statutory_bonus_percent"] / 100) * year_progress
-    
-    if "vacation_bonus" in bonuses:
-        total += monthly_salary * (bonuses["vacation_bonus"] / 100) * year_progress
-    
-    return total
+    return float(_bonus_accrual(rule, employee["monthly_salary_local"], ctx.year_progress))
 
 
-def calculate_vacation_accrual(employee: dict, country_code: str) -> float:
+def calculate_vacation_accrual(employee: dict, country_code: str, ctx: DayCtx) -> float:
     """Calculate accrued vacation payout"""
     monthly_salary = employee["monthly_salary_local"]
-    today = date.today()
-    year_start = date(today.year, 1, 1)
-    days_in_year = (today - year_start).days
-    
-    accrual_rates = {
-        "BR": 30, "FR": 25, "DE": 20, "IN": 21, "PH": 5,
-        "MX": 12, "GB": 28, "NL": 20, "SG": 14, "AU": 20
-    }
     
-    annual_days = accrual_rates.get(country_code, 20)
-    days_accrued = (annual_days / 365) * days_in_year
-    daily_rate = monthly_salary / 22
+    annual_days = COMPILED_RULES.get(country_code, DEFAULT_RULE).annual_leave_days
+    days_accrued = (annual_days * INV_DAYS_PER_YEAR) * ctx.days_in_year
+    daily_rate = monthly_salary * INV_WORK_DAYS_PER_MONTH
     
     return days_accrued * daily_rate
 
 
-def calculate_employee_liability(employee: dict) -> dict:
+def calculate_employee_liability(employee: dict, ctx: Optional[DayCtx] = None) -> dict:
     """Calculate full liability for an employee"""
+    ctx = ctx or DayCtx.for_date()
     country_code = employee["country_code"]
-    country = COUNTRY_RULES.get(country_code, {})
+    rule = COMPILED_RULES.get(country_code, DEFAULT_RULE)
+    _, tenure_months, tenure_years = calculate_tenure(employee["start_date"], today_ordinal=ctx.today_ordinal)
     
-    notice_days, notice_cost = calculate_notice_period(employee, country)
-    severance = calculate_severance(employee, country)
-    bonuses = calculate_statutory_bonuses(employee, country)
-    vacation = calculate_vacation_accrual(employee, country_code)
+    notice_days, notice_cost = calculate_notice_period(employee, rule, tenure_months, tenure_years)
+    severance = calculate_severance(employee, rule, tenure_months, tenure_years)
+    bonuses = calculate_statutory_bonuses(employee, rule, ctx)
+    vacation = calculate_vacation_accrual(employee, country_code, ctx)
     
     total_local = notice_cost + severance + bonuses + vacation
     total_usd = convert_to_usd(total_local, employee["currency"])
     
     # Risk score calculation
     liability_score = min(total_usd / 100000, 1.0) * 35
-    fx_score = FX_VOLATILITY.get(employee["currency"], 0.10) / 0.20 * 25
-    legal_scores = {"high": 0.9, "medium": 0.5, "low": 0.2}
-    legal_score = legal_scores.get(country.get("legal_risk", "medium"), 0.5) * 15
+    fx_score = VOLATILITY_TABLE[CURRENCY_INDEX.get(employee["currency"], DEFAULT_CURRENCY_INDEX)] / 0.20 * 25
+    legal_score = rule.legal_score * 15
     risk_score = min(liability_score + fx_score + legal_score + 10, 100)
     
     return {
         "employee_id": employee["employee_id"],
         "name": employee["name"],
         "country_code": country_code,
-        "country_name": country.get("name", country_code),
+        "country_name": rule.name or country_code,
         "currency": employee["currency"],
         "notice_days": notice_days,
         "notice_cost": notice_cost,
@@ -406,78 +741,209 @@ def calculate_employee_liability(employee: dict) -> dict:
         "total_usd": total_usd,
         "risk_score": risk_score,
         "fx_volatility": get_volatility_rating(employee["currency"]),
-        "legal_risk": country.get("legal_risk", "medium").title(),
-        "tenure_years": calculate_tenure(employee["start_date"])[2]
+        "legal_risk": rule.legal_risk.title(),
+        "tenure_years": tenure_years
     }
 
 
-def calculate_portfolio(employees: List[dict]) -> dict:
-    """Calculate liability for entire portfolio"""
-    results = [calculate_employee_liability(emp) for emp in employees]
-    
-    total_liability = sum(r["total_usd"] for r in results)
-    
-    # Aggregate by country
-    by_country = {}
-    for r in results:
-        code = r["country_code"]
-        if code not in by_country:
-            by_country[code] = {
-                "country_name": r["country_name"],
-                "employee_count": 0,
-                "total_usd": 0,
-                "employees": []
-            }
-        by_country[code]["employee_count"] += 1
-        by_country[code]["total_usd"] += r["total_usd"]
-        by_country[code]["employees"].append(r["employee_id"])
-    
-    # Add percentages
-    for code, data in by_country.items():
-        data["percent"] = (data["total_usd"] / total_liability * 100) if total_liability > 0 else 0
-    
-    # Generate alerts
-    alerts = []
-    for code, data in by_country.items():
-        if data["percent"] > 30:
-            alerts.append(f"🚨 CONCENTRATION: {data['country_name']} holds {data['percent']:.1f}% of total liability")
-    
-    for r in results:
-        if r["total_usd"] > 100000:
-            alerts.append(f"⚠️ HIGH EXPOSURE: {r['name']} liability ${r['total_usd']:,.0f}")
-        if FX_VOLATILITY.get(r["currency"], 0) > 0.15:
-            alerts.append(f"💱 FX RISK: {r['name']} exposed to high {r['currency']} volatility")
+def calculate_portfolio(employees: Union[List[dict], pd.DataFrame]) -> dict:
+    """Calculate liability for entire portfolio (a list of employee dicts or an employee DataFrame)"""
+    # Columnar (structure-of-arrays) view of the portfolio, built once
+    df = pd.DataFrame(employees, columns=[
+        "employee_id", "name", "country_code", "start_date",
+        "monthly_salary_local", "currency", "job_level"
+    ])
+    country_codes = df["country_code"].to_numpy()
+    currencies = df["currency"]
+    monthly_salary = df["monthly_salary_local"].to_numpy(dtype=float)
+    job_level = df["job_level"].to_numpy()
+    
+    ctx = DayCtx.for_date()
+    start_dates = pd.to_datetime(df["start_date"], format="%Y-%m-%d").to_numpy().astype("datetime64[D]")
+    tenure_days = (np.datetime64(ctx.today, "D") - start_dates).astype(int)
+    tenure_months = tenure_days // 30
+    tenure_years = tenure_days * INV_DAYS_PER_TENURE_YEAR
+    
+    # Uniform accruals run in one pass over parameters gathered by integer country id
+    country_idx = df["country_code"].map(COUNTRY_INDEX).fillna(DEFAULT_COUNTRY_INDEX).to_numpy(dtype=int)
+    params = SimpleNamespace(**{name: column[country_idx] for name, column in RULE_TABLE.items()})
+    daily_rate = monthly_salary * INV_WORK_DAYS_PER_MONTH
+    bonuses = _bonus_accrual(params, monthly_salary, ctx.year_progress)
+    vacation = (params.annual_leave_days * INV_DAYS_PER_YEAR) * ctx.days_in_year * daily_rate
+    legal_score = params.legal_score
+    legal_risk = LEGAL_RISK_LABELS[country_idx]
+    
+    # Branchy notice/severance rules are applied per country group over the whole column
+    n = len(df)
+    notice_days = np.zeros(n, dtype=int)
+    severance = np.zeros(n)
+    country_names = country_codes.astype(object)
+    
+    for code in pd.unique(country_codes):
+        rule = COMPILED_RULES.get(code, DEFAULT_RULE)
+        mask = country_codes == code
+        notice_days[mask] = rule.notice_fn(tenure_months[mask], tenure_years[mask], job_level[mask])
+        severance[mask] = rule.severance_fn(monthly_salary[mask], tenure_months[mask], tenure_years[mask])
+        country_names[mask] = rule.name or code
+    
+    notice_cost = notice_days * daily_rate
+    
+    total_local = notice_cost + severance + bonuses + vacation
+    currency_idx = currencies.map(CURRENCY_INDEX).fillna(DEFAULT_CURRENCY_INDEX).to_numpy(dtype=int)
+    total_usd = total_local / FX_RATES_ARR[currency_idx]
+    
+    # Risk score calculation
+    fx_volatility = VOLATILITY_TABLE[currency_idx]
+    liability_score = np.minimum(total_usd / 100000, 1.0) * 35
+    fx_score = fx_volatility / 0.20 * 25
+    risk_score = np.minimum(liability_score + fx_score + legal_score * 15 + 10, 100)
+    
+    # One fixed-width record per employee: string fields are sized to the longest value
+    # and numeric fields stay contiguous, so totals below are single NumPy reductions
+    columns = {
+        "employee_id": df["employee_id"].to_numpy(dtype=str),
+        "name": df["name"].to_numpy(dtype=str),
+        "country_code": country_codes.astype(str),
+        "country_name": country_names.astype(str),
+        "currency": currencies.to_numpy(dtype=str),
+        "notice_days": notice_days,
+        "notice_cost": notice_cost,
+        "severance": severance,
+        "bonuses": bonuses,
+        "vacation": vacation,
+        "total_local": total_local,
+        "total_usd": total_usd,
+        "risk_score": risk_score,
+        "fx_volatility": VOLATILITY_RATINGS[VOLATILITY_RATING_TABLE[currency_idx]].astype(str),
+        "legal_risk": legal_risk.astype(str),
+        "tenure_years": tenure_years
+    }
+    results = np.rec.fromarrays(list(columns.values()), names=list(columns))
+    results_df = pd.DataFrame(columns)
+    
+    total_liability = float(total_usd.sum())
+    
+    # Aggregate by country, keeping countries in order of first appearance
+    by_country_df = results_df.groupby("country_code", sort=False).agg(
+        country_name=("country_name", "first"),
+        employee_count=("employee_id", "size"),
+        total_usd=("total_usd", "sum"),
+        employees=("employee_id", list)
+    )
+    by_country_df["percent"] = (by_country_df["total_usd"] / total_liability * 100) if total_liability > 0 else 0.0
+    by_country = by_country_df.to_dict("index")
+    
+    # Generate alerts from boolean masks; only the flagged rows are formatted
+    concentrated = by_country_df.loc[by_country_df["percent"] > 30, ["country_name", "percent"]]
+    high = results_df.loc[total_usd > 100000, ["name", "total_usd"]]
+    fx_exposed = results_df.loc[fx_volatility > 0.15, ["name", "currency"]]
+    # Alerts are bucketed by severity here, so the UI never re-parses or classifies messages
+    alerts_by_sev = {
+        "error": [
+            *(f"🚨 CONCENTRATION: {name} holds {percent:.1f}% of total liability"
+              for name, percent in concentrated.itertuples(index=False)),
+            *(f"⚠️ HIGH EXPOSURE: {name} liability ${usd:,.0f}" for name, usd in high.itertuples(index=False))
+        ],
+        "warning": [
+            f"💱 FX RISK: {name} exposed to high {currency} volatility"
+            for name, currency in fx_exposed.itertuples(index=False)
+        ],
+        "info": []
+    }
+    # Identical messages (e.g. two same-named employees) add nothing; keep first-seen order
+    alerts_by_sev = {severity: list(dict.fromkeys(messages)) for severity, messages in alerts_by_sev.items()}
     
     return {
         "employees": results,
         "by_country": by_country,
         "total_liability_usd": total_liability,
         "total_employees": len(results),
-        "high_risk_count": sum(1 for r in results if r["risk_score"] > 70),
-        "avg_risk_score": sum(r["risk_score"] for r in results) / len(results) if results else 0,
-        "alerts": alerts
+        "high_risk_count": int((risk_score > 70).sum()),
+        "avg_risk_score": float(risk_score.mean()) if len(results) else 0.0,
+        "alerts_by_sev": alerts_by_sev
     }
 
 
+@st.cache_resource(ttl=3600)
+def calculate_portfolio_cached(_employees: pd.DataFrame, digest: str) -> dict:
+    """Portfolio calculation memoized by input digest; shared across sessions, so treat it as read-only"""
+    portfolio = calculate_portfolio(_employees)
+    portfolio["employees"].flags.writeable = False
+    # UI inputs derived from the results are built here so they expire with the portfolio
+    portfolio["employees_frame"] = employees_frame(portfolio["employees"])
+    portfolio["risk_histogram"] = np.histogram(portfolio["employees"]["risk_score"], bins=15)
+    portfolio["employee_labels"] = employee_labels(portfolio["employees"])
+    # Sidebar country list, rendered once per portfolio rather than one st.write per country
+    portfolio["sidebar_countries_md"] = "\n\n".join(
+        f"**{info['country_name']}**: {info['employee_count']} employees" for info in portfolio["by_country"].values()
+    )
+    return portfolio
+
+
 # ============================================================================
 # UI COMPONENTS
 # ============================================================================
 
+def employees_frame(records: np.ndarray) -> pd.DataFrame:
+    """Employee results as an Arrow-backed DataFrame indexed by employee_id.
+    
+    Stored in the shared cached portfolio: filter and sort into new frames, never modify in place.
+    """
+    numeric_columns = {
+        name: pd.ArrowDtype(pa.from_numpy_dtype(records.dtype[name]))
+        for name in records.dtype.names if records.dtype[name].kind in "if"
+    }
+    return pd.DataFrame(records).astype({
+        **numeric_columns,
+        "employee_id": "string[pyarrow]",
+        "name": "string[pyarrow]",
+        "country_code": "category",
+        "country_name": "category",
+        "currency": "category",
+        "fx_volatility": "category",
+        "legal_risk": "category"
+    }).set_index("employee_id", drop=False)
+
+
+def employee_labels(records: np.ndarray) -> Dict[str, str]:
+    """Employee selectbox labels ("ID - Name") keyed by employee id"""
+    return {
+        emp_id: f"{emp_id} - {name}"
+        for emp_id, name in zip(records["employee_id"].tolist(), records["name"].tolist())
+    }
+
+
+# Streamlit element for each alert severity bucket produced by calculate_portfolio, in display order
+ALERT_RENDERERS = {"error": st.error, "warning": st.warning, "info": st.info}
+
+# Employees tab table: displayed columns in order, with their labels and formats
+EMPLOYEE_TABLE_COLUMNS = {
+    "employee_id": "ID",
+    "name": "Name",
+    "country_name": "Country",
+    "tenure_years": st.column_config.NumberColumn("Tenure (yrs)", format="%.1f"),
+    "total_usd": st.column_config.NumberColumn("Liability (USD)", format="$%.0f"),
+    "risk_score": st.column_config.NumberColumn("Risk Score", format="%.0f"),
+    "fx_volatility": "FX Risk",
+    "legal_risk": "Legal Risk"
+}
+
+
 def render_metric_card(label: str, value: str, delta: str = None):
     """Render a styled metric"""
     st.metric(label, value, delta)
 
 
-def create_country_treemap(by_country: dict):
+@st.cache_resource(ttl=3600)
+def create_country_treemap(countries: Tuple[str, ...], liabilities: Tuple[float, ...],
+                           employee_counts: Tuple[int, ...], percents: Tuple[float, ...]):
     """Create country liability treemap"""
-    data = [{
-        "Country": info["country_name"],
-        "Liability (USD)": info["total_usd"],
-        "Employees": info["employee_count"],
-        "% of Total": info["percent"]
-    } for code, info in by_country.items()]
-    
-    df = pd.DataFrame(data)
+    df = pd.DataFrame({
+        "Country": countries,
+        "Liability (USD)": liabilities,
+        "Employees": employee_counts,
+        "% of Total": percents
+    })
     
     fig = px.treemap(
         df, path=["Country"], values="Liability (USD)",
@@ -489,12 +955,11 @@ def create_country_treemap(by_country: dict):
     return fig
 
 
-def create_risk_histogram(employees: list):
-    """Create risk score distribution"""
-    scores = [e["risk_score"] for e in employees]
-    
+@st.cache_resource
+def _risk_histogram_base() -> go.Figure:
+    """Data-independent part of the risk histogram (styling, thresholds, layout)"""
     fig = go.Figure()
-    fig.add_trace(go.Histogram(x=scores, nbinsx=15, marker_color="#6366f1", opacity=0.8))
+    fig.add_trace(go.Bar(marker_color="#6366f1", opacity=0.8))
     fig.add_vline(x=70, line_dash="dash", line_color="red", annotation_text="High Risk")
     fig.add_vline(x=40, line_dash="dash", line_color="orange", annotation_text="Medium")
     
@@ -506,22 +971,67 @@ def create_risk_histogram(employees: list):
     return fig
 
 
+@st.cache_resource(ttl=3600)
+def create_risk_histogram(counts: Tuple[int, ...], edges: Tuple[float, ...]):
+    """Create risk score distribution from pre-computed bins (see calculate_portfolio_cached)"""
+    # Copy the shared base (never mutate it: cached resources are shared across sessions)
+    fig = go.Figure(_risk_histogram_base())
+    # Bars for the NumPy bins, so the figure carries 15 bars instead of every score
+    counts, edges = np.asarray(counts), np.asarray(edges)
+    fig.data[0].update(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=(edges[1] - edges[0]) * 0.9)
+    return fig
+
+
+# Static FX chart inputs, derived once from the currency tables
+VOLATILITY_RATING_COLORS = np.array(["#22c55e", "#f59e0b", "#ef4444"], dtype=object)
+_FX_CHART_DF = pd.DataFrame({
+    "Currency": list(FX_VOLATILITY),
+    "Volatility (%)": VOLATILITY_TABLE[:len(FX_VOLATILITY)] * 100,
+    "Color": VOLATILITY_RATING_COLORS[VOLATILITY_RATING_TABLE[:len(FX_VOLATILITY)]]
+}).sort_values("Volatility (%)", ascending=True)
+_FX_CHART_DF["Label"] = _FX_CHART_DF["Volatility (%)"].round(1).astype(str) + "%"
+
+# Static Rules-tab country summary, read from the compiled per-country tables
+_RULES_SUMMARY_DF = pd.DataFrame({
+    "Country": [country["name"] for country in COUNTRY_RULES.values()],
+    "Currency": [country["currency"] for country in COUNTRY_RULES.values()],
+    "Legal Risk": LEGAL_RISK_LABELS[:DEFAULT_COUNTRY_INDEX],
+    "Has 13th Month": np.where(RULE_TABLE["thirteenth_month"][:DEFAULT_COUNTRY_INDEX] > 0, "✅", "❌")
+})
+
+# Countries view rule sections, serialized once so reruns hand st.code ready-made text
+COUNTRY_RULES_JSON = {
+    code: {
+        section: json.dumps(country.get(section, {}), indent=2, ensure_ascii=False)
+        for section in ("notice_period", "severance", "statutory_bonuses")
+    }
+    for code, country in COUNTRY_RULES.items()
+}
+
+# Static Rules-tab FX table (every quoted currency against USD), formatted by the frontend
+_FX_TABLE_CURRENCIES = [currency for currency in FX_RATES if currency != "USD"]
+_FX_TABLE_DF = pd.DataFrame({
+    "Currency": _FX_TABLE_CURRENCIES,
+    "Rate (per USD)": np.array([FX_RATES[currency] for currency in _FX_TABLE_CURRENCIES]),
+    "30-Day Volatility": np.array([FX_VOLATILITY.get(currency, 0.0) for currency in _FX_TABLE_CURRENCIES]) * 100,
+    "Rating": VOLATILITY_RATINGS[
+        VOLATILITY_RATING_TABLE[[CURRENCY_INDEX[currency] for currency in _FX_TABLE_CURRENCIES]]
+    ]
+})
+FX_TABLE_COLUMNS = {
+    "Rate (per USD)": st.column_config.NumberColumn(format="%.2f"),
+    "30-Day Volatility": st.column_config.NumberColumn(format="%.1f%%")
+}
+
+
+@st.cache_resource(ttl=3600)
 def create_fx_chart():
     """Create FX volatility chart"""
-    data = [{
-        "Currency": curr,
-        "Volatility (%)": vol * 100,
-        "Rating": get_volatility_rating(curr)
-    } for curr, vol in FX_VOLATILITY.items()]
-    
-    df = pd.DataFrame(data).sort_values("Volatility (%)", ascending=True)
-    colors = df["Rating"].map({"Low": "#22c55e", "Medium": "#f59e0b", "High": "#ef4444"})
-    
     fig = go.Figure()
     fig.add_trace(go.Bar(
-        y=df["Currency"], x=df["Volatility (%)"],
-        orientation="h", marker_color=colors,
-        text=df["Volatility (%)"].round(1).astype(str) + "%",
+        y=_FX_CHART_DF["Currency"], x=_FX_CHART_DF["Volatility (%)"],
+        orientation="h", marker_color=_FX_CHART_DF["Color"],
+        text=_FX_CHART_DF["Label"],
         textposition="outside"
     ))
     fig.add_vline(x=15, line_dash="dash", line_color="red", annotation_text="Alert Threshold")
@@ -534,20 +1044,12 @@ def create_fx_chart():
     return fig
 
 
-def create_liability_pie(employees: list):
-    """Create liability breakdown pie chart"""
-    totals = {
-        "Notice Period": sum(e["notice_cost"] for e in employees),
-        "Severance": sum(e["severance"] for e in employees),
-        "Statutory Bonuses": sum(e["bonuses"] for e in employees),
-        "Vacation Accrual": sum(e["vacation"] for e in employees)
-    }
-    
-    # Convert to USD for comparison
+@st.cache_resource
+def _liability_pie_base() -> go.Figure:
+    """Data-independent part of the liability pie (labels, colors, layout)"""
     fig = go.Figure()
     fig.add_trace(go.Pie(
-        labels=list(totals.keys()),
-        values=list(totals.values()),
+        labels=["Notice Period", "Severance", "Statutory Bonuses", "Vacation Accrual"],
         hole=0.4,
         marker_colors=["#6366f1", "#8b5cf6", "#a78bfa", "#c4b5fd"]
     ))
@@ -560,6 +1062,194 @@ def create_liability_pie(employees: list):
     return fig
 
 
+@st.cache_resource(ttl=3600)
+def create_liability_pie(component_totals: Tuple[float, float, float, float]):
+    """Create liability breakdown pie chart from notice, severance, bonus and vacation totals"""
+    fig = go.Figure(_liability_pie_base())
+    fig.data[0].values = component_totals
+    return fig
+
+
+# ============================================================================
+# VIEWS
+# ============================================================================
+
+def render_dashboard(portfolio: dict):
+    """Dashboard view: headline metrics, alerts and charts"""
+    # Metrics row
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Liability", f"${portfolio['total_liability_usd']:,.0f}")
+    with col2:
+        st.metric("Employees", portfolio["total_employees"])
+    with col3:
+        st.metric("High Risk", portfolio["high_risk_count"])
+    with col4:
+        st.metric("Avg Risk Score", f"{portfolio['avg_risk_score']:.1f}")
+    
+    # Alerts
+    alerts_by_sev = portfolio["alerts_by_sev"]
+    if any(alerts_by_sev.values()):
+        st.markdown("### 🚨 Active Alerts")
+        for severity, render in ALERT_RENDERERS.items():
+            for message in alerts_by_sev[severity]:
+                render(message)
+    else:
+        st.success("✅ All thresholds within normal range")
+    
+    st.markdown("---")
+    
+    # Charts (figures are cached, so pass hashable primitives rather than the dicts)
+    by_country = portfolio["by_country"].values()
+    employees = portfolio["employees"]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(create_country_treemap(
+            tuple(info["country_name"] for info in by_country),
+            tuple(info["total_usd"] for info in by_country),
+            tuple(info["employee_count"] for info in by_country),
+            tuple(info["percent"] for info in by_country)
+        ), use_container_width=True)
+    with col2:
+        counts, edges = portfolio["risk_histogram"]
+        st.plotly_chart(create_risk_histogram(tuple(counts.tolist()), tuple(edges.tolist())), use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(create_fx_chart(), use_container_width=True)
+    with col2:
+        component_totals = tuple(
+            float(employees[key].sum()) for key in ("notice_cost", "severance", "bonuses", "vacation")
+        )
+        st.plotly_chart(create_liability_pie(component_totals), use_container_width=True)
+
+
+def render_employees(portfolio: dict):
+    """Employees view: filterable risk table and per-employee detail"""
+    st.markdown("### 👥 Employee Risk Analysis")
+    
+    # Filters
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        countries = ["All"] + sorted(info["country_name"] for info in portfolio["by_country"].values())
+        selected_country = st.selectbox("Filter by Country", countries)
+    with col2:
+        risk_filter = st.selectbox("Filter by Risk", ["All", "High (>70)", "Medium (40-70)", "Low (<40)"])
+    with col3:
+        sort_by = st.selectbox("Sort by", ["Risk Score ↓", "Liability ↓", "Name"])
+    
+    # Filter and sort with vectorized masks over the cached frame
+    filtered = portfolio["employees_frame"]
+    if selected_country != "All":
+        filtered = filtered[filtered["country_name"] == selected_country]
+    
+    risk_score = filtered["risk_score"]
+    if risk_filter == "High (>70)":
+        filtered = filtered[risk_score > 70]
+    elif risk_filter == "Medium (40-70)":
+        filtered = filtered[risk_score.between(40, 70)]
+    elif risk_filter == "Low (<40)":
+        filtered = filtered[risk_score < 40]
+    
+    # Stable sorts keep ties in portfolio order
+    if sort_by == "Risk Score ↓":
+        filtered = filtered.sort_values("risk_score", ascending=False, kind="stable")
+    elif sort_by == "Liability ↓":
+        filtered = filtered.sort_values("total_usd", ascending=False, kind="stable")
+    else:
+        filtered = filtered.sort_values("name", kind="stable")
+    
+    st.markdown(f"*Showing {len(filtered)} employees*")
+    
+    # Table (raw columns; labels and number formats are applied by the frontend)
+    st.dataframe(
+        filtered, use_container_width=True, hide_index=True,
+        column_order=list(EMPLOYEE_TABLE_COLUMNS), column_config=EMPLOYEE_TABLE_COLUMNS
+    )
+    
+    # Detail view
+    st.markdown("### 📋 Employee Detail")
+    if len(filtered):
+        # Options are the frame's employee ids; display labels come from a cached lookup
+        emp_id = st.selectbox(
+            "Select employee", filtered.index, format_func=portfolio["employee_labels"].__getitem__
+        )
+        # Duplicate ids make .loc return a frame; like the id scan it replaced, take the first match
+        emp = filtered.loc[[emp_id]].iloc[0]
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            # One markdown element per column instead of one st.write per line
+            st.markdown(
+                "**Liability Breakdown**\n\n"
+                f"- Notice ({emp['notice_days']} days): {emp['notice_cost']:,.0f} {emp['currency']}\n"
+                f"- Severance: {emp['severance']:,.0f} {emp['currency']}\n"
+                f"- Statutory Bonuses: {emp['bonuses']:,.0f} {emp['currency']}\n"
+                f"- Vacation Accrual: {emp['vacation']:,.0f} {emp['currency']}\n"
+                f"- **Total (Local):** {emp['total_local']:,.0f} {emp['currency']}\n"
+                f"- **Total (USD):** ${emp['total_usd']:,.0f}"
+            )
+        
+        with col2:
+            st.markdown(
+                "**Risk Factors**\n\n"
+                f"- Risk Score: **{emp['risk_score']:.0f}/100**\n"
+                f"- FX Volatility: **{emp['fx_volatility']}**\n"
+                f"- Legal Risk: **{emp['legal_risk']}**\n"
+                f"- Tenure: **{emp['tenure_years']:.1f} years**"
+            )
+
+
+def render_countries(portfolio: dict):
+    """Countries view: one country's exposure and raw rules"""
+    st.markdown("### 🌍 Country Analysis")
+    
+    selected_code = st.selectbox(
+        "Select Country",
+        list(COUNTRY_RULES.keys()),
+        format_func=lambda x: COUNTRY_RULES[x]["name"]
+    )
+    
+    country = COUNTRY_RULES[selected_code]
+    country_data = portfolio["by_country"].get(selected_code, {})
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Employees", country_data.get("employee_count", 0))
+    with col2:
+        st.metric("Total Liability", f"${country_data.get('total_usd', 0):,.0f}")
+    with col3:
+        st.metric("% of Portfolio", f"{country_data.get('percent', 0):.1f}%")
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Notice Period Rules**")
+        st.code(COUNTRY_RULES_JSON[selected_code]["notice_period"], language="json")
+    with col2:
+        st.markdown("**Severance Rules**")
+        st.code(COUNTRY_RULES_JSON[selected_code]["severance"], language="json")
+    
+    st.markdown("**Statutory Bonuses**")
+    st.code(COUNTRY_RULES_JSON[selected_code]["statutory_bonuses"], language="json")
+    
+    st.markdown(f"**Legal Risk Rating:** {country.get('legal_risk', 'medium').title()}")
+
+
+def render_rules():
+    """Rules view: static country rules and FX reference tables"""
+    st.markdown("### 📋 Country Rules Reference")
+    st.markdown("Severance and notice period rules by country:")
+    
+    st.dataframe(_RULES_SUMMARY_DF, use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    st.markdown("### 💱 FX Rates & Volatility")
+    
+    st.dataframe(_FX_TABLE_DF, use_container_width=True, hide_index=True, column_config=FX_TABLE_COLUMNS)
+
+
 # ============================================================================
 # MAIN APP
 # ============================================================================
@@ -571,7 +1261,8 @@ def main():
     st.markdown("---")
     
     # Calculate portfolio
-    portfolio = calculate_portfolio(SAMPLE_EMPLOYEES)
+    digest = employees_digest()
+    portfolio = calculate_portfolio_cached(load_employees(), digest)
     
     # Sidebar
     with st.sidebar:
@@ -583,8 +1274,7 @@ def main():
         
         st.markdown("---")
         st.markdown("### 🌍 Countries Covered")
-        for code, info in portfolio["by_country"].items():
-            st.write(f"**{info['country_name']}**: {info['employee_count']} employees")
+        st.markdown(portfolio["sidebar_countries_md"])
         
         st.markdown("---")
         st.markdown("### ℹ️ About")
@@ -598,188 +1288,19 @@ def main():
         Built for EOR portfolio demonstration.
         """)
     
-    # Main content tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 Dashboard", "👥 Employees", "🌍 Countries", "📋 Rules"])
-    
-    # TAB 1: Dashboard
-    with tab1:
-        # Metrics row
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Liability", f"${portfolio['total_liability_usd']:,.0f}")
-        with col2:
-            st.metric("Employees", portfolio["total_employees"])
-        with col3:
-            st.metric("High Risk", portfolio["high_risk_count"])
-        with col4:
-            st.metric("Avg Risk Score", f"{portfolio['avg_risk_score']:.1f}")
-        
-        # Alerts
-        if portfolio["alerts"]:
-            st.markdown("### 🚨 Active Alerts")
-            for alert in portfolio["alerts"]:
-                if "CONCENTRATION" in alert or "HIGH" in alert:
-                    st.error(alert)
-                elif "FX" in alert:
-                    st.warning(alert)
-                else:
-                    st.info(alert)
-        else:
-            st.success("✅ All thresholds within normal range")
-        
-        st.markdown("---")
-        
-        # Charts
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(create_country_treemap(portfolio["by_country"]), use_container_width=True)
-        with col2:
-            st.plotly_chart(create_risk_histogram(portfolio["employees"]), use_container_width=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(create_fx_chart(), use_container_width=True)
-        with col2:
-            st.plotly_chart(create_liability_pie(portfolio["employees"]), use_container_width=True)
-    
-    # TAB 2: Employee Analysis
-    with tab2:
-        st.markdown("### 👥 Employee Risk Analysis")
-        
-        # Filters
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            countries = ["All"] + list(set(e["country_name"] for e in portfolio["employees"]))
-            selected_country = st.selectbox("Filter by Country", countries)
-        with col2:
-            risk_filter = st.selectbox("Filter by Risk", ["All", "High (>70)", "Medium (40-70)", "Low (<40)"])
-        with col3:
-            sort_by = st.selectbox("Sort by", ["Risk Score ↓", "Liability ↓", "Name"])
-        
-        # Filter and sort
-        filtered = portfolio["employees"]
-        if selected_country != "All":
-            filtered = [e for e in filtered if e["country_name"] == selected_country]
-        
-        if risk_filter == "High (>70)":
-            filtered = [e for e in filtered if e["risk_score"] > 70]
-        elif risk_filter == "Medium (40-70)":
-            filtered = [e for e in filtered if 40 <= e["risk_score"] <= 70]
-        elif risk_filter == "Low (<40)":
-            filtered = [e for e in filtered if e["risk_score"] < 40]
-        
-        if sort_by == "Risk Score ↓":
-            filtered = sorted(filtered, key=lambda x: x["risk_score"], reverse=True)
-        elif sort_by == "Liability ↓":
-            filtered = sorted(filtered, key=lambda x: x["total_usd"], reverse=True)
-        else:
-            filtered = sorted(filtered, key=lambda x: x["name"])
-        
-        st.markdown(f"*Showing {len(filtered)} employees*")
-        
-        # Table
-        df = pd.DataFrame([{
-            "ID": e["employee_id"],
-            "Name": e["name"],
-            "Country": e["country_name"],
-            "Tenure (yrs)": f"{e['tenure_years']:.1f}",
-            "Liability (USD)": f"${e['total_usd']:,.0f}",
-            "Risk Score": f"{e['risk_score']:.0f}",
-            "FX Risk": e["fx_volatility"],
-            "Legal Risk": e["legal_risk"]
-        } for e in filtered])
-        
-        st.dataframe(df, use_container_width=True, hide_index=True)
-        
-        # Detail view
-        st.markdown("### 📋 Employee Detail")
-        emp_options = [f"{e['employee_id']} - {e['name']}" for e in filtered]
-        if emp_options:
-            selected = st.selectbox("Select employee", emp_options)
-            emp_id = selected.split(" - ")[0]
-            emp = next((e for e in filtered if e["employee_id"] == emp_id), None)
-            
-            if emp:
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("**Liability Breakdown**")
-                    st.write(f"- Notice ({emp['notice_days']} days): {emp['notice_cost']:,.0f} {emp['currency']}")
-                    st.write(f"- Severance: {emp['severance']:,.0f} {emp['currency']}")
-                    st.write(f"- Statutory Bonuses: {emp['bonuses']:,.0f} {emp['currency']}")
-                    st.write(f"- Vacation Accrual: {emp['vacation']:,.0f} {emp['currency']}")
-                    st.write(f"- **Total (Local):** {emp['total_local']:,.0f} {emp['currency']}")
-                    st.write(f"- **Total (USD):** ${emp['total_usd']:,.0f}")
-                
-                with col2:
-                    st.markdown("**Risk Factors**")
-                    st.write(f"- Risk Score: **{emp['risk_score']:.0f}/100**")
-                    st.write(f"- FX Volatility: **{emp['fx_volatility']}**")
-                    st.write(f"- Legal Risk: **{emp['legal_risk']}**")
-                    st.write(f"- Tenure: **{emp['tenure_years']:.1f} years**")
-    
-    # TAB 3: Country Details
-    with tab3:
-        st.markdown("### 🌍 Country Analysis")
-        
-        selected_code = st.selectbox(
-            "Select Country",
-            list(COUNTRY_RULES.keys()),
-            format_func=lambda x: COUNTRY_RULES[x]["name"]
-        )
-        
-        country = COUNTRY_RULES[selected_code]
-        country_data = portfolio["by_country"].get(selected_code, {})
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Employees", country_data.get("employee_count", 0))
-        with col2:
-            st.metric("Total Liability", f"${country_data.get('total_usd', 0):,.0f}")
-        with col3:
-            st.metric("% of Portfolio", f"{country_data.get('percent', 0):.1f}%")
-        
-        st.markdown("---")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("**Notice Period Rules**")
-            st.json(country.get("notice_period", {}))
-        with col2:
-            st.markdown("**Severance Rules**")
-            st.json(country.get("severance", {}))
-        
-        st.markdown("**Statutory Bonuses**")
-        st.json(country.get("statutory_bonuses", {}))
-        
-        st.markdown(f"**Legal Risk Rating:** {country.get('legal_risk', 'medium').title()}")
-    
-    # TAB 4: Rules Reference
-    with tab4:
-        st.markdown("### 📋 Country Rules Reference")
-        st.markdown("Severance and notice period rules by country:")
-        
-        rules_summary = []
-        for code, country in COUNTRY_RULES.items():
-            rules_summary.append({
-                "Country": country["name"],
-                "Currency": country["currency"],
-                "Legal Risk": country.get("legal_risk", "medium").title(),
-                "Has 13th Month": "✅" if country.get("statutory_bonuses", {}).get("13th_month") else "❌"
-            })
-        
-        st.dataframe(pd.DataFrame(rules_summary), use_container_width=True, hide_index=True)
-        
-        st.markdown("---")
-        st.markdown("### 💱 FX Rates & Volatility")
-        
-        fx_df = pd.DataFrame([{
-            "Currency": curr,
-            "Rate (per USD)": f"{rate:.2f}",
-            "30-Day Volatility": f"{FX_VOLATILITY.get(curr, 0)*100:.1f}%",
-            "Rating": get_volatility_rating(curr)
-        } for curr, rate in FX_RATES.items() if curr != "USD"])
-        
-        st.dataframe(fx_df, use_container_width=True, hide_index=True)
+    # Main content views; unlike st.tabs, only the selected view runs on a rerun
+    view = st.radio(
+        "View", ["📊 Dashboard", "👥 Employees", "🌍 Countries", "📋 Rules"],
+        horizontal=True, label_visibility="collapsed"
+    )
+    if view == "📊 Dashboard":
+        render_dashboard(portfolio)
+    elif view == "👥 Employees":
+        render_employees(portfolio)
+    elif view == "🌍 Countries":
+        render_countries(portfolio)
+    else:
+        render_rules()
 
 
 if __name__ == "__main__":